@@ -16,6 +16,8 @@ description:
     - Create or delete a secret within a given keyvault.
     - By using Key Vault, you can encrypt keys and secrets.
     - Such as authentication keys, storage account keys, data encryption keys, .PFX files, and passwords.
+notes:
+    - I(secret_expiry) and I(secret_valid_from) are parsed with the C(ciso8601) Python package when it is installed, which is faster for ISO 8601 dates.
 options:
     keyvault_uri:
             description:
@@ -28,7 +30,16 @@ options:
     secret_name:
         description:
             - Name of the keyvault secret.
-        required: true
+            - Mutually exclusive with I(secret_names).
+    secret_names:
+        description:
+            - Names of several keyvault secrets to manage with the same value and attributes.
+            - The current state of the secrets is looked up concurrently.
+            - Repeated names are managed once, an empty list leaves every secret unchanged.
+            - Mutually exclusive with I(secret_name).
+        type: list
+        elements: str
+        version_added: '1.14.0'
     secret_value:
         description:
             - Secret to be secured by keyvault.
@@ -72,13 +83,21 @@ EXAMPLES = '''
         secret_name: MySecret
         keyvault_uri: https://contoso.vault.azure.net/
         state: absent
+
+    - name: Delete several secrets
+      azure_rm_keyvaultsecret:
+        secret_names:
+          - MySecret
+          - MyOtherSecret
+        keyvault_uri: https://contoso.vault.azure.net/
+        state: absent
 '''
 
 RETURN = '''
 state:
     description:
         - Current state of the secret.
-    returned: success
+    returned: when I(secret_name) is set
     type: complex
     contains:
         secret_id:
@@ -86,124 +105,233 @@ state:
               - Secret resource path.
           type: str
           example: https://contoso.vault.azure.net/secrets/hello/e924f053839f4431b35bc54393f98423
+secrets:
+    description:
+        - Current state of each secret when I(secret_names) is used.
+    returned: when I(secret_names) is set
+    type: list
+    elements: dict
+    contains:
+        secret_name:
+          description:
+              - Name of the secret.
+          type: str
+          example: hello
+        secret_id:
+          description:
+              - Secret resource path.
+          type: str
+          example: https://contoso.vault.azure.net/secrets/hello/e924f053839f4431b35bc54393f98423
+        status:
+          description:
+              - Whether the secret was created or deleted by this task.
+          returned: when the secret changed
+          type: str
+          example: Created
 '''
 
+import datetime
+import re
+import time
+from collections import OrderedDict
+
 from ansible_collections.azure.azcollection.plugins.module_utils.azure_rm_common import AzureRMModuleBase
 
 try:
+    from concurrent.futures import ThreadPoolExecutor
     from azure.keyvault import KeyVaultClient, KeyVaultAuthentication, KeyVaultId
     from azure.common.credentials import ServicePrincipalCredentials, get_cli_profile
     from azure.keyvault.models.key_vault_error import KeyVaultErrorException
     from msrestazure.azure_active_directory import MSIAuthentication
-    import dateutil.parser
     from azure.keyvault.models.secret_attributes import SecretAttributes
 except ImportError:
     # This is handled in azure_rm_common
     pass
 
+try:
+    from ciso8601 import parse_datetime as _ciso_parse_datetime
+except ImportError:
+    # ciso8601 is optional, _parse_datetime falls back to the standard library
+    _ciso_parse_datetime = None
+
+# Argument spec is built once at import, AzureRMModuleBase merges it into a fresh dict
+_ARG_SPEC = dict(
+    secret_name=dict(type='str'),
+    secret_names=dict(type='list', elements='str'),
+    secret_value=dict(type='str', no_log=True),
+    secret_valid_from=dict(type='str', no_log=True),
+    secret_expiry=dict(type='str', no_log=True),
+    keyvault_uri=dict(type='str', no_log=True, required=True),
+    state=dict(type='str', default='present', choices=['present', 'absent']),
+    content_type=dict(type='str')
+)
+
+_REQUIRED_IF = [
+    ('state', 'present', ['secret_value'])
+]
+
+_MUTUALLY_EXCLUSIVE = [['secret_name', 'secret_names']]
+_REQUIRED_ONE_OF = [['secret_name', 'secret_names']]
+
+_PARAM_NAMES = tuple(_ARG_SPEC.keys()) + ('tags',)
+
+# datetime.fromisoformat is only available on Python 3.7 and later
+_HAS_FROMISOFORMAT = hasattr(datetime.datetime, 'fromisoformat')
+
+# ISO 8601 strings datetime.fromisoformat accepts on Python 3.7 and later, only checked when _HAS_FROMISOFORMAT
+_ISO_RE = re.compile(r'^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d{3}(\d{3})?)?)?(Z|[+-]\d{2}:\d{2})?)?$')
+
+# Already canonical secret urls: lowercase host without port, no query or fragment.
+# Anything else goes through KeyVaultId.parse_secret_id, which normalizes it
+_SECRET_ID_RE = re.compile(r'^(https://[a-z0-9.-]+/secrets/[^/?#]+)(?:/([^/?#]+))?/?$')
+
+
+def _parse_sid(url):
+    ''' Returns the canonical secret id of a secret url '''
+    match = _SECRET_ID_RE.match(url)
+    if match is None:
+        return KeyVaultId.parse_secret_id(url).id
+    if match.group(2):
+        return match.group(1) + '/' + match.group(2)
+    return match.group(1)
+
+
+def _parse_datetime(value):
+    ''' Parses a datetime string, using ciso8601 or the ISO 8601 fast path for matching strings and dateutil otherwise '''
+    if _ciso_parse_datetime:
+        try:
+            return _ciso_parse_datetime(value)
+        except ValueError:
+            pass
+    if _HAS_FROMISOFORMAT and _ISO_RE.match(value):
+        return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    import dateutil.parser
+    return dateutil.parser.parse(value)
+
 
 class AzureRMKeyVaultSecret(AzureRMModuleBase):
     ''' Module that creates or deletes secrets in Azure KeyVault '''
 
     def __init__(self):
 
-        self.module_arg_spec = dict(
-            secret_name=dict(type='str', required=True),
-            secret_value=dict(type='str', no_log=True),
-            secret_valid_from=dict(type='str', no_log=True),
-            secret_expiry=dict(type='str', no_log=True),
-            keyvault_uri=dict(type='str', no_log=True, required=True),
-            state=dict(type='str', default='present', choices=['present', 'absent']),
-            content_type=dict(type='str')
-        )
-
-        required_if = [
-            ('state', 'present', ['secret_value'])
-        ]
+        self.module_arg_spec = _ARG_SPEC
 
         self.results = dict(
             changed=False,
             state=dict()
         )
 
-        self.secret_name = None
-        self.secret_value = None
-        self.secret_valid_from = None
-        self.secret_expiry = None
-        self.keyvault_uri = None
-        self.state = None
+        for key in _ARG_SPEC:
+            setattr(self, key, None)
         self.data_creds = None
         self.client = None
         self.tags = None
-        self.content_type = None
 
-        super(AzureRMKeyVaultSecret, self).__init__(self.module_arg_spec,
+        super(AzureRMKeyVaultSecret, self).__init__(_ARG_SPEC,
                                                     supports_check_mode=True,
-                                                    required_if=required_if,
+                                                    required_if=_REQUIRED_IF,
+                                                    mutually_exclusive=_MUTUALLY_EXCLUSIVE,
+                                                    required_one_of=_REQUIRED_ONE_OF,
                                                     supports_tags=True)
 
     def exec_module(self, **kwargs):
 
-        for key in list(self.module_arg_spec.keys()) + ['tags']:
+        for key in _PARAM_NAMES:
             setattr(self, key, kwargs[key])
 
+        if self.secret_names is not None:
+            # Manage each secret once, keeping the order they were given in
+            secret_names = list(OrderedDict.fromkeys(self.secret_names))
+            del self.results['state']
+            self.results['secrets'] = []
+            if not secret_names:
+                return self.results
+        else:
+            secret_names = [self.secret_name]
+
         # Create KeyVault Client
         self.client = self.get_keyvault_client()
 
-        results = dict()
-        changed = False
+        if len(secret_names) > 1:
+            # Look up the secrets concurrently, the workers share the client
+            with ThreadPoolExecutor(max_workers=min(16, len(secret_names))) as executor:
+                current_states = list(executor.map(self.check_secret, secret_names))
+        else:
+            current_states = [self.check_secret(secret_names[0])]
 
-        try:
-            results = self.get_secret(self.secret_name)
+        # Fail from the main thread only, so the module prints a single result
+        for results, changed, error in current_states:
+            if error:
+                self.fail(error)
 
-            # Secret exists and will be deleted
-            if self.state == 'absent':
-                changed = True
-            elif self.secret_value and results['secret_value'] != self.secret_value:
-                changed = True
+        valid_from = self.secret_valid_from
+        if valid_from:
+            valid_from = _parse_datetime(valid_from)
 
-        except KeyVaultErrorException:
-            # Secret doesn't exist
-            if self.state == 'present':
-                changed = True
+        expiry = self.secret_expiry
+        if expiry:
+            expiry = _parse_datetime(expiry)
+
+        secrets = []
+        for name, (results, changed, error) in zip(secret_names, current_states):
+            results = self.update_secret_state(name, results, changed, valid_from, expiry)
+            if self.secret_names is not None:
+                results['secret_name'] = name
+            secrets.append(results)
+            self.results['changed'] = self.results['changed'] or changed
+
+        if self.secret_names is not None:
+            self.results['secrets'] = secrets
+        else:
+            self.results['state'] = secrets[0]
 
-        self.results['changed'] = changed
-        self.results['state'] = results
+        return self.results
 
-        valid_from = self.secret_valid_from
-        if isinstance(valid_from, str) and len(valid_from) > 0:
-            valid_from = dateutil.parser.parse(valid_from)
+    def check_secret(self, name):
+        ''' Gets the current state of a secret, whether it has to change and the error getting it '''
+        try:
+            results = self.get_secret(name) or dict()
+        except Exception as exc:
+            return None, False, "Error getting secret {0} - {1}".format(name, str(exc))
+        exists = bool(results)
 
-        expiry = self.secret_expiry
-        if isinstance(expiry, str) and len(expiry) > 0:
-            expiry = dateutil.parser.parse(expiry)
+        # Create a missing secret, delete an existing one or update a different value
+        changed = (not exists and self.state == 'present') or \
+                  (exists and self.state == 'absent') or \
+                  (exists and bool(self.secret_value) and results['secret_value'] != self.secret_value)
+
+        return results, changed, None
+
+    def update_secret_state(self, name, results, changed, valid_from, expiry):
+        ''' Creates or deletes a secret according to the requested state '''
+        if not changed:
+            return results
 
         if not self.check_mode:
             # Create secret
-            if self.state == 'present' and changed:
-                results['secret_id'] = self.create_update_secret(self.secret_name, self.secret_value, self.tags, self.content_type, valid_from, expiry)
-                self.results['state'] = results
-                self.results['state']['status'] = 'Created'
+            if self.state == 'present':
+                results['secret_id'] = self.create_update_secret(name, self.secret_value, self.tags, self.content_type, valid_from, expiry)
             # Delete secret
-            elif self.state == 'absent' and changed:
-                results['secret_id'] = self.delete_secret(self.secret_name)
-                self.results['state'] = results
-                self.results['state']['status'] = 'Deleted'
-        else:
-            if self.state == 'present' and changed:
-                self.results['state']['status'] = 'Created'
-            elif self.state == 'absent' and changed:
-                self.results['state']['status'] = 'Deleted'
+            else:
+                results['secret_id'] = self.delete_secret(name)
 
-        return self.results
+        results['status'] = 'Created' if self.state == 'present' else 'Deleted'
+        return results
 
     def get_keyvault_client(self):
+        client = self.create_keyvault_client()
+        # Keep the msrest session open so TLS connections are pooled across requests
+        client.config.keep_alive = True
+        return client
+
+    def create_keyvault_client(self):
         kv_url = self.azure_auth._cloud_environment.suffixes.keyvault_dns.split('.', 1).pop()
+        resource_url = "https://{0}".format(kv_url)
         # Don't use MSI credentials if the auth_source isn't set to MSI.  The below will Always result in credentials when running on an Azure VM.
         if self.module.params['auth_source'] == 'msi':
             try:
                 self.log("Get KeyVaultClient from MSI")
-                credentials = MSIAuthentication(resource="https://{0}".format(kv_url))
+                credentials = MSIAuthentication(resource=resource_url)
                 return KeyVaultClient(credentials)
             except Exception:
                 self.log("Get KeyVaultClient from service principal")
@@ -211,16 +339,23 @@ class AzureRMKeyVaultSecret(AzureRMModuleBase):
             try:
                 profile = get_cli_profile()
                 credentials, subscription_id, tenant = profile.get_login_credentials(
-                    subscription_id=self.credentials['subscription_id'], resource="https://{0}".format(kv_url))
+                    subscription_id=self.credentials['subscription_id'], resource=resource_url)
                 return KeyVaultClient(credentials)
             except Exception as exc:
                 self.log("Get KeyVaultClient from service principal")
                 # self.fail("Failed to load CLI profile {0}.".format(str(exc)))
 
         # Create KeyVault Client using KeyVault auth class and auth_callback
+        if self.credentials['client_id'] is None or self.credentials['secret'] is None:
+            self.fail('Please specify client_id, secret and tenant to access azure Key Vault.')
+
+        token_cache = dict()
+
         def auth_callback(server, resource, scope):
-            if self.credentials['client_id'] is None or self.credentials['secret'] is None:
-                self.fail('Please specify client_id, secret and tenant to access azure Key Vault.')
+            # Reuse the last token until it is about to expire
+            token = token_cache.get('token')
+            if token and float(token.get('expires_on', 0)) - 60 > time.time():
+                return token['token_type'], token['access_token']
 
             tenant = self.credentials.get('tenant')
             if not self.credentials['tenant']:
@@ -231,33 +366,39 @@ class AzureRMKeyVaultSecret(AzureRMModuleBase):
                 secret=self.credentials['secret'],
                 tenant=tenant,
                 cloud_environment=self._cloud_environment,
-                resource="https://{0}".format(kv_url))
+                resource=resource_url)
 
             token = authcredential.token
+            token_cache['token'] = token
             return token['token_type'], token['access_token']
 
         return KeyVaultClient(KeyVaultAuthentication(auth_callback))
 
     def get_secret(self, name, version=''):
-        ''' Gets an existing secret '''
-        secret_bundle = self.client.get_secret(self.keyvault_uri, name, version)
+        ''' Gets an existing secret, None if it doesn't exist '''
+        try:
+            secret_bundle = self.client.get_secret(self.keyvault_uri, name, version)
+        except KeyVaultErrorException as exc:
+            # Secret doesn't exist
+            if exc.response is not None and exc.response.status_code == 404:
+                return None
+            raise
         if secret_bundle:
-            secret_id = KeyVaultId.parse_secret_id(secret_bundle.id)
-            return dict(secret_id=secret_id.id, secret_value=secret_bundle.value)
+            return dict(secret_id=_parse_sid(secret_bundle.id), secret_value=secret_bundle.value)
         return None
 
     def create_update_secret(self, name, secret, tags, content_type, valid_from, expiry):
         ''' Creates/Updates a secret '''
-        secret_attributes = SecretAttributes(expires=expiry, not_before=valid_from)
+        secret_attributes = None
+        if expiry or valid_from:
+            secret_attributes = SecretAttributes(expires=expiry, not_before=valid_from)
         secret_bundle = self.client.set_secret(self.keyvault_uri, name, secret, tags=tags, content_type=content_type, secret_attributes=secret_attributes)
-        secret_id = KeyVaultId.parse_secret_id(secret_bundle.id)
-        return secret_id.id
+        return _parse_sid(secret_bundle.id)
 
     def delete_secret(self, name):
         ''' Deletes a secret '''
         deleted_secret = self.client.delete_secret(self.keyvault_uri, name)
-        secret_id = KeyVaultId.parse_secret_id(deleted_secret.id)
-        return secret_id.id
+        return _parse_sid(deleted_secret.id)
 
 
 def main():